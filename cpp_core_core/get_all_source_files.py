@@ -6,35 +6,74 @@ source files with consistent include/exclude and extension filters, so other
 libraries can depend on cpp_core instead of duplicating this logic.
 """
 
+import functools
 import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Set
+from typing import Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
 
 
-# Default directory names that are excluded from scanning (any path segment)
-DEFAULT_EXCLUDE_DIRS = {
+# Default directory names that are excluded from scanning (any path segment).
+# Frozen and interned once at import so per-call exclude sets reuse the hashes.
+DEFAULT_EXCLUDE_DIRS = frozenset(sys.intern(d) for d in (
     ".pio",      # PlatformIO build and libdeps
     ".git",
     "build",
     ".vscode",
     ".idea",
-}
+))
 
 # Default C++ source extensions (case-insensitive)
 DEFAULT_SOURCE_EXTENSIONS = [".h", ".hpp", ".cpp", ".cc", ".cxx"]
 
-
-def _normalize_extensions(extensions: Optional[List[str]]) -> Set[str]:
-    """Return a set of lowercase extensions, each starting with '.'."""
+# Normalized forms of DEFAULT_SOURCE_EXTENSIONS, built once for the common default case
+_DEFAULT_EXT_SET = frozenset(e.lower() for e in DEFAULT_SOURCE_EXTENSIONS)
+_DEFAULT_EXT_TUPLE = tuple(sorted(_DEFAULT_EXT_SET))
+
+# Negative cache shared across walks in one process, consulted only with use_cache=True:
+# (suffix tuple, exclude dir names) -> {dir path: (st_mtime_ns or None, walkable subdir paths)}
+# for directories that held no matching files when last listed. A directory's mtime
+# changes whenever entries are added, removed or renamed in it, so an entry with the
+# current mtime lets a walk skip that readdir; subdirectories are still visited.
+_no_match_dir_cache: Dict[
+    Tuple[Tuple[str, ...], FrozenSet[str]],
+    Dict[str, Tuple[Optional[int], Tuple[str, ...]]],
+] = {}
+_NO_MATCH_DIR_CACHE_MAX = 100000
+# mtimes this close to the walk start are "racy": on filesystems with coarse timestamps
+# (1-2 s on HFS+, FAT/exFAT, ext3) a file created later in the same tick would not change
+# the mtime, so such directories are stored without one and listed again next time.
+_RACY_MTIME_WINDOW_NS = 2000000000
+
+
+def _normalize_extensions(extensions: Optional[List[str]]) -> FrozenSet[str]:
+    """Return a frozenset of lowercase extensions, each starting with '.'."""
     if not extensions:
-        return {e.lower() for e in DEFAULT_SOURCE_EXTENSIONS}
+        return _DEFAULT_EXT_SET
     out = set()
     for e in extensions:
         e = str(e).lower()
         if not e.startswith("."):
             e = "." + e
         out.add(e)
-    return out
+    return frozenset(out)
+
+
+def _exclude_dir_set(
+    exclude_dirs: Optional[List[str]],
+    exclude_folders: Optional[List[str]],
+) -> FrozenSet[str]:
+    """DEFAULT_EXCLUDE_DIRS plus extra directory names and the first segment of each exclude folder."""
+    extra = []
+    if exclude_dirs:
+        extra.extend(d.lstrip(".") if d.startswith(".") else d for d in exclude_dirs)
+    if exclude_folders:
+        extra.extend(Path(f).parts[0] if Path(f).parts else f for f in exclude_folders)
+    if not extra:
+        return DEFAULT_EXCLUDE_DIRS
+    return DEFAULT_EXCLUDE_DIRS | frozenset(sys.intern(d) for d in extra)
 
 
 def _path_has_excluded_part(path: Path, exclude_dirs: Set[str]) -> bool:
@@ -45,117 +84,227 @@ def _path_has_excluded_part(path: Path, exclude_dirs: Set[str]) -> bool:
     return False
 
 
-def _path_under_any(path: Path, exclude_paths: Set[Path]) -> bool:
-    """True if path is under any of the given absolute exclude paths."""
-    try:
-        resolved = path.resolve()
-        for ex in exclude_paths:
-            try:
-                if resolved.is_relative_to(ex):
-                    return True
-            except ValueError:
-                pass
-    except (ValueError, OSError):
-        pass
-    return False
+def _path_under_any(path: str, exclude_prefixes: Tuple[str, ...]) -> bool:
+    """
+    True if path is, or is under, one of the exclude prefixes.
+
+    Both sides must already be absolute and normalized; prefixes come from
+    _exclude_prefixes. A plain string compare works on any Python 3 and across
+    drives, unlike Path.is_relative_to (3.9+), and needs no exception handling.
+    """
+    return (os.path.normcase(path) + os.sep).startswith(exclude_prefixes)
+
+
+def _exclude_prefixes(exclude_paths: Set[str]) -> Tuple[str, ...]:
+    """
+    Turn absolute exclude paths into os.sep-terminated prefixes for _path_under_any.
+
+    Case is folded with os.path.normcase (a no-op on POSIX) so that Windows paths
+    compare case-insensitively, as Path.is_relative_to did.
+    """
+    return tuple(os.path.join(os.path.normcase(p), "") for p in exclude_paths)
 
 
 def _walk_for_files(
-    root_path: Path,
+    root_path: str,
     file_extensions: Set[str],
     include_folders: Optional[List[str]],
     exclude_dirs: Set[str],
-    exclude_paths: Optional[Set[Path]] = None,
-) -> List[str]:
+    exclude_paths: Optional[Set[str]] = None,
+    resolve_symlinks: bool = False,
+    recursive: bool = True,
+    use_cache: bool = False,
+) -> Set[str]:
     """
     Walk a directory tree and collect file paths matching extensions and filters.
 
     Args:
-        root_path: Directory to walk.
+        root_path: Directory to walk; resolved here only if it is relative.
         file_extensions: Allowed suffixes (e.g. {'.h', '.cpp'}).
         include_folders: If set, only descend into root_path/f for each f; else whole tree.
         exclude_dirs: Directory names (path segments) that skip a subtree.
-        exclude_paths: If set, paths under any of these (absolute) are skipped.
+        exclude_paths: If set, paths under any of these (absolute, normalized) are skipped.
+        resolve_symlinks: If True, canonicalize symlinks below root_path in returned paths.
+        recursive: If False, only files directly inside each start directory are collected.
+        use_cache: If True, consult and update _no_match_dir_cache to skip re-listing
+            directories whose mtime shows they still hold no matches.
 
     Returns:
-        Sorted list of absolute file path strings.
+        Unordered set of absolute file path strings; callers sort once at the end.
     """
-    root_path = root_path.resolve()
-    if not root_path.exists() or not root_path.is_dir():
-        return []
+    return set(_iwalk_for_files(
+        root_path, file_extensions, include_folders, exclude_dirs,
+        exclude_paths, resolve_symlinks, recursive, use_cache,
+    ))
+
 
-    combined_exclude_paths = set(p.resolve() for p in exclude_paths) if exclude_paths else set()
+def _iwalk_for_files(
+    root_path: str,
+    file_extensions: Set[str],
+    include_folders: Optional[List[str]],
+    exclude_dirs: Set[str],
+    exclude_paths: Optional[Set[str]] = None,
+    resolve_symlinks: bool = False,
+    recursive: bool = True,
+    use_cache: bool = False,
+) -> Iterator[str]:
+    """
+    Lazily yield file paths under root_path matching extensions and filters.
+
+    Arguments are as for _walk_for_files. Paths are yielded in traversal order and
+    may repeat when include_folders overlap.
+    """
+    # Callers pass resolved roots; entries found below them are already absolute.
+    root_str = root_path if os.path.isabs(root_path) else os.path.realpath(root_path)
+    if not os.path.isdir(root_str):
+        return
+
+    exclude_prefixes = _exclude_prefixes(exclude_paths) if exclude_paths else ()
 
     if include_folders:
         roots_to_walk = []
         for folder in include_folders:
-            sub = root_path / folder if not os.path.isabs(folder) else Path(folder)
-            if sub.exists() and sub.is_dir():
+            sub = os.path.normpath(folder if os.path.isabs(folder) else os.path.join(root_str, folder))
+            if os.path.isdir(sub):
                 roots_to_walk.append(sub)
         if not roots_to_walk:
-            roots_to_walk = [root_path]
+            roots_to_walk = [root_str]
     else:
-        roots_to_walk = [root_path]
+        roots_to_walk = [root_str]
 
-    result = []
+    if file_extensions is _DEFAULT_EXT_SET:
+        exts_tuple = _DEFAULT_EXT_TUPLE
+    else:
+        exts_tuple = tuple(sorted(file_extensions))
+    # Both cases, since the last character is tested before lowercasing the name
+    last_chars = frozenset(c for e in exts_tuple for c in (e[-1], e[-1].upper()))
+
+    # Directories with no direct matches for this filter, from earlier walks (opt-in)
+    no_match_dirs = None
+    if use_cache:
+        no_match_dirs = _no_match_dir_cache.setdefault((exts_tuple, frozenset(exclude_dirs)), {})
+        if len(no_match_dirs) > _NO_MATCH_DIR_CACHE_MAX:
+            no_match_dirs.clear()
+
+    resolved_dirs = {}
+    # Hot loop runs once per directory entry; bind attribute lookups to locals
+    scandir = os.scandir
+    stat = os.stat
+    racy_after = time.time_ns() - _RACY_MTIME_WINDOW_NS
     for start in roots_to_walk:
-        for root, dirs, files in os.walk(start):
-            root_path_obj = Path(root)
-
-            if _path_has_excluded_part(root_path_obj, exclude_dirs):
-                dirs.clear()
+        # Subdirectories are pruned by name below, so only the start needs a check, and
+        # only its segments below the walk root count: library roots live under
+        # build/_deps or .pio/libdeps, whose names are excluded for the project walk.
+        if start != root_str:
+            try:
+                below_root = Path(os.path.relpath(start, root_str))
+            except ValueError:
+                below_root = Path(start)  # different drive on Windows
+            if _path_has_excluded_part(below_root, exclude_dirs):
                 continue
-            if combined_exclude_paths and _path_under_any(root_path_obj, combined_exclude_paths):
-                dirs.clear()
+        stack = [start]
+        extend = stack.extend
+        pop = stack.pop
+        while stack:
+            current = pop()
+
+            if exclude_prefixes and _path_under_any(current, exclude_prefixes):
                 continue
 
-            for name in files:
-                p = root_path_obj / name
-                if p.suffix.lower() not in file_extensions:
-                    continue
+            # Only directories already seen without matches pay for a stat. The mtime
+            # is taken before listing so a concurrent change invalidates the entry;
+            # first sightings are stored without one and get validated next time.
+            mtime = None
+            cached = no_match_dirs.get(current) if no_match_dirs is not None else None
+            if cached is not None:
                 try:
-                    result.append(str(p.resolve()))
-                except (ValueError, OSError):
-                    pass
+                    mtime = stat(current).st_mtime_ns
+                except OSError:
+                    continue
+                if cached[0] == mtime:
+                    # Same entries as last time: no files to yield, known subdirectories
+                    if recursive:
+                        extend(cached[1])
+                    continue
 
-            # Don't descend into excluded directory names
-            dirs[:] = [d for d in dirs if d not in exclude_dirs]
+            subdirs = []
+            matched = False
+            try:
+                with scandir(current) as it:
+                    for entry in it:
+                        name = entry.name
+                        if entry.is_dir(follow_symlinks=False):
+                            # Don't descend into excluded directory names
+                            if name not in exclude_dirs:
+                                subdirs.append(entry.path)
+                            continue
+                        if name[-1] not in last_chars:
+                            continue
+                        name_lower = name.lower()
+                        # A bare ".h" is a hidden file with no suffix, not a header
+                        if not name_lower.endswith(exts_tuple) or name_lower in file_extensions:
+                            continue
+                        # A symlink to a directory is neither recursed into nor a file
+                        # (os.walk listed it under dirs); only matching symlinks pay a stat
+                        is_link = entry.is_symlink()
+                        if is_link and entry.is_dir():
+                            continue
+                        matched = True
+                        if not resolve_symlinks:
+                            yield entry.path
+                        elif is_link:
+                            yield os.path.realpath(entry.path)
+                        else:
+                            # Sibling files share their parent's resolved prefix
+                            parent = resolved_dirs.get(current)
+                            if parent is None:
+                                parent = resolved_dirs[current] = os.path.realpath(current)
+                            yield os.path.join(parent, name)
+            except OSError:
+                continue
 
-    return sorted(result)
+            if no_match_dirs is not None:
+                if not matched:
+                    if mtime is not None and mtime >= racy_after:
+                        mtime = None
+                    no_match_dirs[current] = (mtime, tuple(subdirs))
+                else:
+                    # Drop stale entries so later walks don't stat this directory for nothing
+                    no_match_dirs.pop(current, None)
+            if recursive:
+                extend(subdirs)
 
 
 def _discover_libraries_desktop(project_dir: str) -> List[Path]:
     """
     Discover library root directories for a desktop (CMake) build.
     Looks under project_dir/build/_deps; includes *-src dirs or dirs with include/ or src/.
+    project_dir must already be resolved.
     """
-    project_path = Path(project_dir).resolve()
+    project_path = Path(project_dir)
     build_deps = project_path / "build" / "_deps"
     libraries = []
-    seen = set()
 
     if not build_deps.exists() or not build_deps.is_dir():
         return libraries
 
-    for lib_dir in build_deps.iterdir():
-        if not lib_dir.is_dir() or lib_dir.name.startswith("."):
-            continue
-        name = lib_dir.name
-        if name.endswith("-src"):
-            lib_root = lib_dir.resolve()
-            if str(lib_root) not in seen:
-                seen.add(str(lib_root))
-                libraries.append(lib_root)
-        elif (lib_dir / "include").exists() and (lib_dir / "include").is_dir():
-            lib_root = lib_dir.resolve()
-            if str(lib_root) not in seen:
-                seen.add(str(lib_root))
-                libraries.append(lib_root)
-        elif (lib_dir / "src").exists() and (lib_dir / "src").is_dir():
-            lib_root = lib_dir.resolve()
-            if str(lib_root) not in seen:
-                seen.add(str(lib_root))
-                libraries.append(lib_root)
+    # project_path is resolved, so children of build_deps are already absolute.
+    # DirEntry.is_dir() only costs a stat for symlinks, so one readdir per library
+    # answers both the include/ and src/ probes.
+    with os.scandir(build_deps) as it:
+        for lib_dir in it:
+            if not lib_dir.is_dir() or lib_dir.name.startswith("."):
+                continue
+            if lib_dir.name.endswith("-src"):
+                libraries.append(Path(lib_dir.path))
+                continue
+            try:
+                with os.scandir(lib_dir.path) as inner:
+                    children = {e.name for e in inner if e.is_dir()}
+            except OSError:
+                continue
+            if "include" in children or "src" in children:
+                libraries.append(Path(lib_dir.path))
 
     return libraries
 
@@ -164,29 +313,239 @@ def _discover_libraries_arduino(project_dir: str) -> List[Path]:
     """
     Discover library root directories for an Arduino (PlatformIO) build.
     Looks under project_dir/.pio/libdeps/<env>/<lib>.
+    project_dir must already be resolved.
     """
-    project_path = Path(project_dir).resolve()
+    project_path = Path(project_dir)
     pio_libdeps = project_path / ".pio" / "libdeps"
     libraries = []
-    seen = set()
 
     if not pio_libdeps.exists() or not pio_libdeps.is_dir():
         return libraries
 
+    # project_path is resolved, so children of pio_libdeps are already absolute
     for env_dir in pio_libdeps.iterdir():
         if not env_dir.is_dir():
             continue
         for lib_dir in env_dir.iterdir():
-            if not lib_dir.is_dir():
-                continue
-            lib_root = lib_dir.resolve()
-            if str(lib_root) not in seen:
-                seen.add(str(lib_root))
-                libraries.append(lib_root)
+            if lib_dir.is_dir():
+                libraries.append(lib_dir)
 
     return libraries
 
 
+# Minimum number of top-level subdirectories before the project walk is sharded
+_SHARD_MIN_SUBDIRS = 4
+
+
+def _top_level_shards(
+    root: str,
+    include_folders: Optional[List[str]],
+    exclude_dirs: Set[str],
+) -> List[str]:
+    """
+    Top-level subdirectories of root to walk as independent shards.
+
+    Returns an empty list (walk root as one tree) when include_folders already narrows
+    the walk or root has fewer than _SHARD_MIN_SUBDIRS walkable subdirectories.
+    """
+    if include_folders:
+        return []
+    try:
+        with os.scandir(root) as it:
+            subdirs = [
+                e.path for e in it
+                if e.is_dir(follow_symlinks=False) and e.name not in exclude_dirs
+            ]
+    except OSError:
+        return []
+    return subdirs if len(subdirs) >= _SHARD_MIN_SUBDIRS else []
+
+
+def _walk_project_and_libraries(
+    project_root: str,
+    lib_roots: List[Path],
+    file_extensions: Set[str],
+    include_folders: Optional[List[str]],
+    exclude_dirs: Set[str],
+    exclude_paths: Optional[FrozenSet[str]],
+    resolve_symlinks: bool,
+    max_workers: Optional[int],
+    use_cache: bool = False,
+) -> Set[str]:
+    """
+    Walk the project root and every library root, returning the union of matched files.
+
+    When the caller opts in with max_workers > 1, a project root with many top-level
+    subdirectories is split into one walk per subdirectory plus a non-recursive walk
+    of the root itself; on local disks sharding costs an extra readdir and thread
+    start-up for no gain, so it is reserved for slow (e.g. network) filesystems.
+    With three or more walks in total they run on a thread pool so that directory
+    reads overlap.
+    exclude_paths only applies to the project walks.
+    """
+    # (start, exclude_paths, recursive) for each independent walk
+    walks = []
+    shards = []
+    if max_workers is not None and max_workers > 1:
+        shards = _top_level_shards(project_root, include_folders, exclude_dirs)
+    if shards:
+        walks.append((project_root, exclude_paths, False))
+        walks.extend((shard, exclude_paths, True) for shard in shards)
+    else:
+        walks.append((project_root, exclude_paths, True))
+    walks.extend((str(lib_root), None, True) for lib_root in lib_roots)
+
+    if len(walks) < 3:
+        all_paths = set()
+        for start, start_exclude_paths, recursive in walks:
+            all_paths |= _walk_for_files(
+                start, file_extensions, include_folders, exclude_dirs,
+                start_exclude_paths, resolve_symlinks, recursive, use_cache,
+            )
+        return all_paths
+
+    if max_workers is None:
+        max_workers = min(32, len(walks), (os.cpu_count() or 1) + 4)
+    all_paths = set()
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        futures = [
+            ex.submit(
+                _walk_for_files, start, file_extensions, include_folders,
+                exclude_dirs, start_exclude_paths, resolve_symlinks, recursive, use_cache,
+            )
+            for start, start_exclude_paths, recursive in walks
+        ]
+        for fut in futures:
+            all_paths |= fut.result()
+    return all_paths
+
+
+def _normalize_exclude_paths(
+    root_str: str,
+    folders: Optional[List[str]],
+) -> FrozenSet[str]:
+    """
+    Absolute, normalized exclude paths for exclude_folders under the resolved root_str.
+
+    Relative folders are joined and normalized as strings: the walk never follows
+    directory symlinks, so that names the same subtree the walker visits. Absolute
+    folders come from the caller and may go through symlinks, so they are resolved.
+    """
+    if not folders:
+        return frozenset()
+    return frozenset(
+        os.path.realpath(f) if os.path.isabs(f) else os.path.normpath(os.path.join(root_str, f))
+        for f in folders
+    )
+
+
+def _prepare_scan(
+    project_dir: str,
+    file_extensions: Optional[List[str]],
+    exclude_folders: Optional[List[str]],
+    exclude_dirs: Optional[List[str]],
+) -> Tuple[str, FrozenSet[str], FrozenSet[str], FrozenSet[str]]:
+    """
+    Normalize the public scan arguments once per call.
+
+    Returns:
+        (resolved project root, extension set, excluded dir names, absolute exclude paths).
+    """
+    # Resolve once; everything below works on strings under this root
+    project_root = os.path.realpath(project_dir)
+    ext_set = _normalize_extensions(file_extensions)
+
+    exclude_dir_set = _exclude_dir_set(exclude_dirs, exclude_folders)
+
+    exclude_paths = _normalize_exclude_paths(project_root, exclude_folders)
+
+    return project_root, ext_set, exclude_dir_set, exclude_paths
+
+
+def _iter_project_and_libraries(
+    project_root: str,
+    lib_roots: List[Path],
+    file_extensions: Set[str],
+    include_folders: Optional[List[str]],
+    exclude_dirs: Set[str],
+    exclude_paths: Optional[FrozenSet[str]],
+    resolve_symlinks: bool,
+) -> Iterator[str]:
+    """
+    Sequentially yield matched files from the project root, then each library root.
+
+    Duplicates are filtered only when walks can overlap; otherwise no path set is kept.
+    Library roots alone cannot overlap: they are distinct directories, and the
+    project walk never enters build/ or .pio/ where they live.
+    """
+    walks = [(project_root, exclude_paths)]
+    walks.extend((str(lib_root), None) for lib_root in lib_roots)
+    may_overlap = resolve_symlinks or bool(include_folders) and (
+        # Nested folders (e.g. 'src', 'src/a') list the same files twice
+        len(include_folders) > 1
+        # An absolute include folder is walked again for every root
+        or (len(walks) > 1 and any(os.path.isabs(f) for f in include_folders))
+    )
+    seen = set()
+    for root, root_exclude_paths in walks:
+        for path in _iwalk_for_files(
+            root, file_extensions, include_folders, exclude_dirs,
+            root_exclude_paths, resolve_symlinks,
+        ):
+            if may_overlap:
+                if path in seen:
+                    continue
+                seen.add(path)
+            yield path
+
+
+def _collect_files(
+    is_cmake: bool,
+    project_dir: str,
+    file_extensions: Optional[List[str]],
+    include_folders: Optional[List[str]],
+    exclude_folders: Optional[List[str]],
+    exclude_dirs: Optional[List[str]],
+    include_libraries: bool,
+    resolve_symlinks: bool,
+    max_workers: Optional[int],
+    use_cache: bool = False,
+) -> List[str]:
+    """Shared body of get_all_files_desktop/arduino, without the stdout listing."""
+    project_root, ext_set, exclude_dir_set, exclude_paths = _prepare_scan(
+        project_dir, file_extensions, exclude_folders, exclude_dirs
+    )
+
+    if not include_libraries:
+        lib_roots = []
+    elif is_cmake:
+        lib_roots = _discover_libraries_desktop(project_root)
+    else:
+        lib_roots = _discover_libraries_arduino(project_root)
+
+    # Project files (the walk skips build/ and .pio/, so libdeps aren't double-counted)
+    # plus library files
+    all_paths = _walk_project_and_libraries(
+        project_root,
+        lib_roots,
+        ext_set,
+        include_folders,
+        exclude_dir_set,
+        exclude_paths if exclude_paths else None,
+        resolve_symlinks,
+        max_workers,
+        use_cache,
+    )
+    return sorted(all_paths)
+
+
+def _print_files(caller: str, files: List[str]) -> None:
+    """Print the '[caller] returning N files:' listing the public getters emit."""
+    print("[{}] returning {} files:".format(caller, len(files)))
+    for f in files:
+        print(f)
+
+
 def get_all_files_desktop(
     project_dir: str,
     file_extensions: Optional[List[str]] = None,
@@ -194,6 +553,9 @@ def get_all_files_desktop(
     exclude_folders: Optional[List[str]] = None,
     exclude_dirs: Optional[List[str]] = None,
     include_libraries: bool = True,
+    resolve_symlinks: bool = False,
+    max_workers: Optional[int] = None,
+    use_cache: bool = False,
 ) -> List[str]:
     """
     Get all source files for a desktop (CMake) build: project + libraries from build/_deps.
@@ -205,56 +567,29 @@ def get_all_files_desktop(
         exclude_folders: Additional subdirs to skip (relative to project_dir); merged with default excludes.
         exclude_dirs: Additional directory names to skip (path segments); merged with DEFAULT_EXCLUDE_DIRS.
         include_libraries: If True, also discover and scan libraries under build/_deps.
+        resolve_symlinks: If True, canonicalize symlinks in returned paths (costs extra syscalls).
+        max_workers: Thread count for parallel scans. Default: one per walk, capped at min(32, CPUs + 4).
+            Passing a value > 1 also shards a large project tree by top-level directory.
+        use_cache: If True, remember directories that held no matching files and skip
+            re-listing them while their mtime is unchanged. Off by default: a stale mtime
+            (e.g. NFS attribute caching) would hide new files. Reset with clear_cache().
 
     Returns:
         Sorted list of absolute file path strings.
     """
-    project_path = Path(project_dir).resolve()
-    ext_set = _normalize_extensions(file_extensions)
-
-    exclude_dir_set = set(DEFAULT_EXCLUDE_DIRS)
-    if exclude_dirs:
-        exclude_dir_set.update(d.lstrip(".") if d.startswith(".") else d for d in exclude_dirs)
-    if exclude_folders:
-        exclude_dir_set.update(
-            Path(f).parts[0] if Path(f).parts else f for f in exclude_folders
-        )
-
-    exclude_paths = set()
-    if exclude_folders:
-        for f in exclude_folders:
-            if os.path.isabs(f):
-                exclude_paths.add(Path(f).resolve())
-            else:
-                exclude_paths.add((project_path / f).resolve())
-
-    all_paths = set()
-
-    # Project files
-    project_files = _walk_for_files(
-        project_path,
-        ext_set,
+    result = _collect_files(
+        True,
+        project_dir,
+        file_extensions,
         include_folders,
-        exclude_dir_set,
-        exclude_paths if exclude_paths else None,
+        exclude_folders,
+        exclude_dirs,
+        include_libraries,
+        resolve_symlinks,
+        max_workers,
+        use_cache,
     )
-    all_paths.update(project_files)
-
-    if include_libraries:
-        for lib_root in _discover_libraries_desktop(project_dir):
-            lib_files = _walk_for_files(
-                lib_root,
-                ext_set,
-                include_folders,
-                exclude_dir_set,
-                None,
-            )
-            all_paths.update(lib_files)
-
-    result = sorted(all_paths)
-    print("[get_all_files_desktop] returning {} files:".format(len(result)))
-    for f in result:
-        print(f)
+    _print_files("get_all_files_desktop", result)
     return result
 
 
@@ -265,6 +600,9 @@ def get_all_files_arduino(
     exclude_folders: Optional[List[str]] = None,
     exclude_dirs: Optional[List[str]] = None,
     include_libraries: bool = True,
+    resolve_symlinks: bool = False,
+    max_workers: Optional[int] = None,
+    use_cache: bool = False,
 ) -> List[str]:
     """
     Get all source files for an Arduino (PlatformIO) build: project + libraries from .pio/libdeps.
@@ -276,68 +614,113 @@ def get_all_files_arduino(
         exclude_folders: Additional subdirs to skip (relative to project_dir); merged with default excludes.
         exclude_dirs: Additional directory names to skip (path segments); merged with DEFAULT_EXCLUDE_DIRS.
         include_libraries: If True, also discover and scan libraries under .pio/libdeps.
+        resolve_symlinks: If True, canonicalize symlinks in returned paths (costs extra syscalls).
+        max_workers: Thread count for parallel scans. Default: one per walk, capped at min(32, CPUs + 4).
+            Passing a value > 1 also shards a large project tree by top-level directory.
+        use_cache: If True, remember directories that held no matching files and skip
+            re-listing them while their mtime is unchanged. Off by default: a stale mtime
+            (e.g. NFS attribute caching) would hide new files. Reset with clear_cache().
 
     Returns:
         Sorted list of absolute file path strings.
     """
-    project_path = Path(project_dir).resolve()
-    ext_set = _normalize_extensions(file_extensions)
-
-    exclude_dir_set = set(DEFAULT_EXCLUDE_DIRS)
-    if exclude_dirs:
-        exclude_dir_set.update(d.lstrip(".") if d.startswith(".") else d for d in exclude_dirs)
-    if exclude_folders:
-        for f in exclude_folders:
-            part = Path(f).parts[0] if Path(f).parts else f
-            exclude_dir_set.add(part)
+    result = _collect_files(
+        False,
+        project_dir,
+        file_extensions,
+        include_folders,
+        exclude_folders,
+        exclude_dirs,
+        include_libraries,
+        resolve_symlinks,
+        max_workers,
+        use_cache,
+    )
+    _print_files("get_all_files_arduino", result)
+    return result
 
-    exclude_paths = set()
-    if exclude_folders:
-        for f in exclude_folders:
-            if os.path.isabs(f):
-                exclude_paths.add(Path(f).resolve())
-            else:
-                exclude_paths.add((project_path / f).resolve())
 
-    all_paths = set()
+def iter_all_files_desktop(
+    project_dir: str,
+    file_extensions: Optional[List[str]] = None,
+    include_folders: Optional[List[str]] = None,
+    exclude_folders: Optional[List[str]] = None,
+    exclude_dirs: Optional[List[str]] = None,
+    include_libraries: bool = True,
+    resolve_symlinks: bool = False,
+) -> Iterator[str]:
+    """
+    Lazily yield the files get_all_files_desktop would return, unsorted and without printing.
 
-    # Project files (excluding .pio so we don't double-count libdeps)
-    project_files = _walk_for_files(
-        project_path,
+    Arguments are as for get_all_files_desktop. Walks run sequentially so that consumers
+    can start on the first files before traversal finishes; use get_all_files_desktop
+    for a sorted list from parallel walks.
+    """
+    project_root, ext_set, exclude_dir_set, exclude_paths = _prepare_scan(
+        project_dir, file_extensions, exclude_folders, exclude_dirs
+    )
+    lib_roots = _discover_libraries_desktop(project_root) if include_libraries else []
+    return _iter_project_and_libraries(
+        project_root,
+        lib_roots,
         ext_set,
         include_folders,
         exclude_dir_set,
         exclude_paths if exclude_paths else None,
+        resolve_symlinks,
     )
-    all_paths.update(project_files)
-
-    if include_libraries:
-        for lib_root in _discover_libraries_arduino(project_dir):
-            lib_files = _walk_for_files(
-                lib_root,
-                ext_set,
-                include_folders,
-                exclude_dir_set,
-                None,
-            )
-            all_paths.update(lib_files)
 
-    result = sorted(all_paths)
-    print("[get_all_files_arduino] returning {} files:".format(len(result)))
-    for f in result:
-        print(f)
-    return result
+
+def iter_all_files_arduino(
+    project_dir: str,
+    file_extensions: Optional[List[str]] = None,
+    include_folders: Optional[List[str]] = None,
+    exclude_folders: Optional[List[str]] = None,
+    exclude_dirs: Optional[List[str]] = None,
+    include_libraries: bool = True,
+    resolve_symlinks: bool = False,
+) -> Iterator[str]:
+    """
+    Lazily yield the files get_all_files_arduino would return, unsorted and without printing.
+
+    Arguments are as for get_all_files_arduino. Walks run sequentially so that consumers
+    can start on the first files before traversal finishes; use get_all_files_arduino
+    for a sorted list from parallel walks.
+    """
+    project_root, ext_set, exclude_dir_set, exclude_paths = _prepare_scan(
+        project_dir, file_extensions, exclude_folders, exclude_dirs
+    )
+    lib_roots = _discover_libraries_arduino(project_root) if include_libraries else []
+    return _iter_project_and_libraries(
+        project_root,
+        lib_roots,
+        ext_set,
+        include_folders,
+        exclude_dir_set,
+        exclude_paths if exclude_paths else None,
+        resolve_symlinks,
+    )
 
 
-def _is_cmake_build(project_dir: Optional[str] = None) -> bool:
+def _is_cmake_build(project_dir: Optional[str] = None, use_cache: bool = False) -> bool:
     """
     Heuristic: True if the current context is a CMake build, False if PlatformIO.
     Uses env vars first; if neither is set, infers from project_dir layout.
+
+    The layout probes run on every call unless use_cache is True, so a deps dir created
+    later in a long-lived process is noticed.
     """
     if os.environ.get("CMAKE_PROJECT_DIR"):
         return True
     if os.environ.get("PROJECT_DIR"):
         return False
+    if use_cache:
+        return _detect_cmake_layout_cached(project_dir)
+    return _detect_cmake_layout(project_dir)
+
+
+def _detect_cmake_layout(project_dir: Optional[str]) -> bool:
+    """Layout half of _is_cmake_build: build/_deps means CMake, .pio/libdeps PlatformIO."""
     if project_dir:
         proj = Path(project_dir).resolve()
         if (proj / "build" / "_deps").exists():
@@ -347,6 +730,10 @@ def _is_cmake_build(project_dir: Optional[str] = None) -> bool:
     return True  # default to desktop/CMake when ambiguous
 
 
+# Memoized layout probe, consulted only when get_all_files_std(use_cache=True)
+_detect_cmake_layout_cached = functools.lru_cache(maxsize=8)(_detect_cmake_layout)
+
+
 def get_all_files_std(
     project_dir: Optional[str] = None,
     file_extensions: Optional[List[str]] = None,
@@ -354,6 +741,9 @@ def get_all_files_std(
     exclude_folders: Optional[List[str]] = None,
     exclude_dirs: Optional[List[str]] = None,
     include_libraries: bool = True,
+    resolve_symlinks: bool = False,
+    max_workers: Optional[int] = None,
+    use_cache: bool = False,
 ) -> List[str]:
     """
     Wrapper: detect CMake vs PlatformIO and call get_all_files_desktop or get_all_files_arduino.
@@ -361,6 +751,13 @@ def get_all_files_std(
     project_dir is taken from the first argument, or from CMAKE_PROJECT_DIR (CMake)
     or PROJECT_DIR (PlatformIO) if not provided.
 
+    With use_cache=True, results are reused per project and arguments until the top
+    level of the project (or its library deps dir) changes, the CMake/PlatformIO
+    layout detection is memoized, and the walk reuses the no-match directory cache
+    (see get_all_files_desktop). Files added or removed deeper in the tree are NOT
+    noticed, so only opt in when the tree is known not to change between calls, or
+    call clear_cache() after it does.
+
     Returns:
         Sorted list of absolute file path strings.
     """
@@ -369,28 +766,93 @@ def get_all_files_std(
     if not project_dir:
         project_dir = os.getcwd()
 
-    if _is_cmake_build(project_dir):
-        return get_all_files_desktop(
+    project_dir = os.path.abspath(project_dir)
+    is_cmake = _is_cmake_build(project_dir, use_cache)
+    if use_cache:
+        result = list(_get_all_files_cached(
+            project_dir,
+            frozenset(file_extensions) if file_extensions else None,
+            tuple(include_folders) if include_folders else None,
+            tuple(exclude_folders) if exclude_folders else None,
+            tuple(exclude_dirs) if exclude_dirs else None,
+            include_libraries,
+            resolve_symlinks,
+            max_workers,
+            is_cmake,
+            _tree_fingerprint(project_dir, is_cmake),
+        ))
+    else:
+        result = _collect_files(
+            is_cmake,
             project_dir,
-            file_extensions=file_extensions,
-            include_folders=include_folders,
-            exclude_folders=exclude_folders,
-            exclude_dirs=exclude_dirs,
-            include_libraries=include_libraries,
+            file_extensions,
+            include_folders,
+            exclude_folders,
+            exclude_dirs,
+            include_libraries,
+            resolve_symlinks,
+            max_workers,
         )
-    return get_all_files_arduino(
+    _print_files("get_all_files_desktop" if is_cmake else "get_all_files_arduino", result)
+    return result
+
+
+def _tree_fingerprint(project_dir: str, is_cmake: bool) -> int:
+    """
+    Coarse change marker for project_dir: its mtime XOR that of the library deps dir.
+
+    Only top-level changes (entries added/removed in project_dir or the deps dir) are
+    detected; call clear_cache() after adding files deeper in the tree.
+    """
+    if is_cmake:
+        deps_dir = os.path.join(project_dir, "build", "_deps")
+    else:
+        deps_dir = os.path.join(project_dir, ".pio", "libdeps")
+    fingerprint = 0
+    for path in (project_dir, deps_dir):
+        try:
+            fingerprint ^= os.stat(path).st_mtime_ns
+        except OSError:
+            pass
+    return fingerprint
+
+
+@functools.lru_cache(maxsize=16)
+def _get_all_files_cached(
+    project_dir: str,
+    file_extensions: Optional[frozenset],
+    include_folders: Optional[Tuple[str, ...]],
+    exclude_folders: Optional[Tuple[str, ...]],
+    exclude_dirs: Optional[Tuple[str, ...]],
+    include_libraries: bool,
+    resolve_symlinks: bool,
+    max_workers: Optional[int],
+    is_cmake: bool,
+    fingerprint: int,
+) -> Tuple[str, ...]:
+    """Memoized body of get_all_files_std; arguments are hashable forms of its own."""
+    return tuple(_collect_files(
+        is_cmake,
         project_dir,
-        file_extensions=file_extensions,
-        include_folders=include_folders,
-        exclude_folders=exclude_folders,
-        exclude_dirs=exclude_dirs,
-        include_libraries=include_libraries,
-    )
+        list(file_extensions) if file_extensions else None,
+        list(include_folders) if include_folders else None,
+        list(exclude_folders) if exclude_folders else None,
+        list(exclude_dirs) if exclude_dirs else None,
+        include_libraries,
+        resolve_symlinks,
+        max_workers,
+        use_cache=True,
+    ))
 
 
-if __name__ == "__main__":
-    import sys
+def clear_cache() -> None:
+    """Forget memoized file lists, build-kind detections and known no-match directories."""
+    _get_all_files_cached.cache_clear()
+    _detect_cmake_layout_cached.cache_clear()
+    _no_match_dir_cache.clear()
+
 
+if __name__ == "__main__":
     project_dir = sys.argv[1] if len(sys.argv) > 1 else None
     mode = (sys.argv[2] if len(sys.argv) > 2 else "std").lower()
 